@@ -5,15 +5,57 @@ import threading
 import time
 import os
 import json
+import socket
+import struct
+import select
+import types
+import heapq
+import itertools
+import collections
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import sys
 import logging
 
 # ─── Константы ──────────────────────────────────────────────────────────────────
 TILE_COLUMNS = 8                  # Количество столбцов плиток
+TILE_WIDTH = 200                  # Ширина одной плитки (px)
+TILE_HEIGHT = 150                 # Высота одной плитки (px)
+TILE_PITCH = TILE_WIDTH + 10      # Шаг плиток по X с учётом зазора
+GRAPH_TOP = 35                    # Верх области графика внутри плитки (px)
+GRAPH_BASE = 115                  # Низ области графика внутри плитки (px)
+GRAPH_SLOTS = 63                  # Сколько столбиков графика помещается в плитку
 LOG_FILE = 'error_log.txt'        # Файл для логирования ошибок
 SETTINGS_FILE = 'settings.json'   # Файл с настройками приложения
-AUTO_SAVE_INTERVAL = 86400        # Интервал автосохранения журнала (сек)
+LOG_FLUSH_INTERVAL = 10           # Как часто сбрасывать файл журнала на диск (сек)
+PROBE_TIMEOUT = 1.0               # Таймаут ожидания ответа на запрос (сек)
+PROBE_INTERVAL = 5                # Интервал между проверками устройства (сек)
+LOG_WINDOW_TAIL = 5000            # Сколько последних записей показывать сразу
+
+# Используемые в коде ключи локализации и их значения по умолчанию
+LANG_DEFAULTS = {
+    'start': 'Старт',
+    'stop': 'Стоп',
+    'reset': 'Сброс',
+    'add': 'Добавить',
+    'delete': 'Удалить',
+    'show_log': 'Журнал',
+    'summary': 'Сводка',
+    'settings': 'Настройки',
+    'enter_ip': 'Введите IP:',
+    'enter_name': 'Введите имя:',
+    'rename': 'Переименование',
+    'rename_prompt': 'Введите новое имя:',
+    'log_window_title': 'Журнал',
+    'clear_log': 'Очистить журнал',
+    'save_log': 'Сохранить журнал',
+    'log_saved': 'Сохранение',
+    'summary_title': 'Сводка',
+    'no_issues': 'Нет неполадок',
+    'language': 'Язык',
+    'save': 'Сохранить',
+    'no_selection': 'Не выбрано устройств',
+}
 
 # ─── Настройка логирования ───────────────────────────────────────────────────────
 logging.basicConfig(
@@ -29,26 +71,64 @@ def log_error(msg):
     # ─── Записывает сообщение об ошибке в лог-файл.
     logging.error(msg)
 
+# ─── Кэш отметки времени ────────────────────────────────────────────────────────
+_last_ts_sec = [0]
+_last_ts_str = ['']
+_ts_lock = threading.Lock()
+
+def now_hms():
+    # Строка 'ЧЧ:ММ:СС', форматируется не чаще раза в секунду:
+    # все проверки, завершившиеся в ту же секунду, получают кэш
+    t = int(time.time())
+    if t == _last_ts_sec[0]:
+        return _last_ts_str[0]
+    with _ts_lock:
+        if t != _last_ts_sec[0]:
+            _last_ts_str[0] = time.strftime('%H:%M:%S', time.localtime(t))
+            _last_ts_sec[0] = t
+        return _last_ts_str[0]
+
+# ─── ICMP-проверка без запуска внешнего ping ────────────────────────────────────
+def _icmp_checksum(data):
+    # Стандартная контрольная сумма ICMP (RFC 1071)
+    if len(data) % 2:
+        data += b'\x00'
+    s = sum(struct.unpack(f'!{len(data)//2}H', data))
+    s = (s >> 16) + (s & 0xFFFF)
+    s += s >> 16
+    return (~s) & 0xFFFF
+
+def _make_icmp_socket():
+    # Пытается создать ICMP-сокет: raw (нужны права), затем dgram (Linux без прав).
+    # Возвращает None, если ни один вариант недоступен - тогда используется ping.
+    for sock_type in (socket.SOCK_RAW, socket.SOCK_DGRAM):
+        try:
+            return socket.socket(socket.AF_INET, sock_type, socket.IPPROTO_ICMP)
+        except OSError:
+            continue
+    return None
+
 # ─── Класс для корректного ввода кириллицы в StringVar ──────────────────────────
 original_StringVar = tk.StringVar
 class FormatStringVar(original_StringVar):
+    # Таблица байт CP1251 -> символ Unicode (строится один раз на класс)
+    _CHARS = (
+        'АБВГДЕЖЗИЙКЛМНОПРСТУФХЦЧШЩЪЫЬЭЮЯ'
+        'абвгдежзийклмнопрстуфхцчшщъыьэюя'
+        'ЁёІіЇїЄє'
+    )
+    _TRANS = str.maketrans({chr(i+192): c for i, c in enumerate(_CHARS)})
+
     def __init__(self, master=None, value=None, name=None):
         # Поддержка вызова с первым аргументом = значение
         if isinstance(master, str) and value is None:
             value, master = master, None
         super().__init__(master=master, value=value, name=name)
         self.trace_add('write', self._on_write)
-        # Карта байт CP1251 -> символ Unicode
-        chars = (
-            'АБВГДЕЖЗИЙКЛМНОПРСТУФХЦЧШЩЪЫЬЭЮЯ'
-            'абвгдежзийклмнопрстуфхцчшщъыьэюя'
-            'ЁёІіЇїЄє'
-        )
-        self._map = {i+192: c for i, c in enumerate(chars)}
 
     def _on_write(self, *args):
         val = self.get()
-        corrected = ''.join(self._map.get(ord(c), c) for c in val)
+        corrected = val.translate(self._TRANS)
         if corrected != val:
             self.set(corrected)
 
@@ -59,22 +139,41 @@ class NetMonitorApp:
     def __init__(self):
         # Инициализация переменных
         self.monitors = []         # Список объектов DeviceMonitor
-        self.row_frames = []       # Список фреймов-строк плиток
-        self.full_log = []         # Список записей журнала (Text + tag)
+        self.rows = []             # Список строк плиток (TileRow)
+        self.full_log = []         # Записи журнала (текст, тег, диапазон тега)
         self.log_lock = threading.Lock()
-        self.auto_save_timer = None
+        self._pending_ui = {}                  # Отложенные обновления плиток
+        self._pending_ui_lock = threading.Lock()
+        self._log_window_open = False          # Окно журнала открыто (без Tcl-вызова)
         self.start_time = None     # Время начала мониторинга
+        self.start_mono = None     # Монотонная отметка старта (для таймера)
+        self._timer_text = ''      # Последний показанный текст таймера
         self.timer_running = False
-        self.last_save_time = None
-        
+        self._log_fh = None        # Файл журнала текущего сеанса (дозапись)
+        self._log_fh_last_flush = 0.0
+        self._settings_dirty = False            # Есть несохранённые настройки
+        self._settings_flush_scheduled = False  # Запись уже запланирована
+
+        # Общий пул потоков для проверок + один поток-планировщик на все плитки
+        self.probe_pool = ThreadPoolExecutor(max_workers=min(16, (os.cpu_count() or 4) * 2))
+        self._schedule_heap = []   # Куча (время, счётчик, монитор)
+        self._schedule_lock = threading.Lock()
+        self._schedule_event = threading.Event()
+        self._schedule_counter = itertools.count()
+        threading.Thread(target=self._scheduler_loop, daemon=True).start()
+
         # Загрузка настроек и локализации
         self.settings = self._load_json(SETTINGS_FILE, default={'language':'ru','devices':{}})
         self.lang = self._load_json(f"lang_{self.settings.get('language','ru')}.json", default={})
+        # Строки интерфейса как атрибуты: доступ без dict.get на каждый вызов
+        self.L = types.SimpleNamespace(**{k: self.lang.get(k, d) for k, d in LANG_DEFAULTS.items()})
 
         # Создание главного окна
         self.root = tk.Tk()
         self._setup_ui()
         self._start_timer_loop()
+        self._drain_log_queue()
+        self._flush_pending_ui()
 
         # Перехват закрытия
         self.root.protocol('WM_DELETE_WINDOW', self._on_close)
@@ -98,6 +197,27 @@ class NetMonitorApp:
         except Exception as e:
             log_error(f"Ошибка сохранения {path}: {e}")
 
+    def _mark_settings_dirty(self):
+        # Откладывает запись settings.json: серия правок даёт одну запись
+        self._settings_dirty = True
+        if not self._settings_flush_scheduled:
+            self._settings_flush_scheduled = True
+            self.root.after(1000, self._flush_settings)
+
+    def _flush_settings(self):
+        # Атомарная запись настроек: временный файл + os.replace
+        self._settings_flush_scheduled = False
+        if not self._settings_dirty:
+            return
+        self._settings_dirty = False
+        tmp = SETTINGS_FILE + '.tmp'
+        try:
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(self.settings, f, ensure_ascii=False, indent=4)
+            os.replace(tmp, SETTINGS_FILE)
+        except Exception as e:
+            log_error(f"Ошибка сохранения {SETTINGS_FILE}: {e}")
+
     def _setup_ui(self):
         # Настройка интерфейса главного окна
         self.root.title('NET Monitor')
@@ -119,7 +239,7 @@ class NetMonitorApp:
         for key, cmd in buttons:
             ttk.Button(
                 toolbar,
-                text=self.lang.get(key, key.capitalize()),
+                text=getattr(self.L, key),
                 command=cmd
             ).pack(side=tk.LEFT, padx=2)
 
@@ -135,10 +255,8 @@ class NetMonitorApp:
         devices = self.settings.get('devices', {})
         for idx, (ip, name) in enumerate(devices.items()):
             if idx % TILE_COLUMNS == 0:
-                frame = ttk.Frame(self.root)
-                frame.pack(fill=tk.X)
-                self.row_frames.append(frame)
-            monitor = DeviceMonitor(frame, ip, name, self)
+                self.rows.append(TileRow(self.root))
+            monitor = DeviceMonitor(self.rows[-1], ip, name, self)
             self.monitors.append(monitor)
 
     def _start_timer_loop(self):
@@ -148,17 +266,25 @@ class NetMonitorApp:
 
     def _update_timer(self):
         # Обновляет отображение времени работы
-        if self.timer_running and self.start_time:
-            delta = datetime.now() - self.start_time
-            d, rem = delta.days, delta.seconds
+        if self.timer_running and self.start_mono is not None:
+            # Целочисленная арифметика по монотонным часам - без timedelta
+            total = int(time.monotonic() - self.start_mono)
+            d, rem = divmod(total, 86400)
             h, rem = divmod(rem, 3600)
             m, s = divmod(rem, 60)
-            self.timer_label.config(text=f"{d}:{h:02}:{m:02}:{s:02}")
+            text = f"{d}:{h:02}:{m:02}:{s:02}"
+            if text != self._timer_text:
+                self._timer_text = text
+                self.timer_label.config(text=text)
 
     def _on_close(self):
-        # Завершение авто-сохранения и закрытие приложения
-        if self.auto_save_timer:
-            self.auto_save_timer.cancel()
+        # Сброс отложенных настроек, закрытие файла журнала и приложения
+        self._flush_settings()
+        if self._log_fh is not None:
+            try:
+                self._log_fh.close()
+            except Exception as e:
+                log_error(f"Ошибка закрытия файла журнала: {e}")
         self.root.destroy()
 
     # ─── Методы мониторинга ───────────────────────────────────────────────────────
@@ -167,8 +293,15 @@ class NetMonitorApp:
         if not self.timer_running:
             self.timer_running = True
             self.start_time = datetime.now()
-            self.last_save_time = self.start_time
-            self._schedule_auto_save()
+            self.start_mono = time.monotonic()
+            # Один файл на сеанс: новые записи дописываются по мере поступления
+            if self._log_fh is None:
+                try:
+                    fn = f"log_{self.start_time.strftime('%Y%m%d_%H%M%S')}.txt"
+                    self._log_fh = open(fn, 'a', encoding='utf-8', buffering=1 << 16)
+                    self._log_fh_last_flush = time.monotonic()
+                except Exception as e:
+                    log_error(f"Ошибка открытия файла журнала: {e}")
         for m in self.monitors:
             m.start_monitoring()
 
@@ -176,39 +309,70 @@ class NetMonitorApp:
         # Останавливает мониторинг
         if self.timer_running:
             self.timer_running = False
-            if self.auto_save_timer:
-                self.auto_save_timer.cancel()
         for m in self.monitors:
             m.stop_monitoring()
 
+    def schedule_probe(self, monitor, delay=0):
+        # Ставит проверку в очередь с текущим поколением монитора:
+        # записи устаревших поколений планировщик отбрасывает
+        with self._schedule_lock:
+            heapq.heappush(self._schedule_heap,
+                           (time.monotonic() + delay, next(self._schedule_counter), monitor, monitor._sched_gen))
+        self._schedule_event.set()
+
+    def _scheduler_loop(self):
+        # Единый планировщик: раздаёт готовые проверки пулу потоков
+        while True:
+            entry = None
+            wait = None
+            with self._schedule_lock:
+                if self._schedule_heap:
+                    due, _, m, gen = self._schedule_heap[0]
+                    wait = due - time.monotonic()
+                    if wait <= 0:
+                        heapq.heappop(self._schedule_heap)
+                        entry = (m, gen)
+            if entry is not None:
+                monitor, gen = entry
+                if monitor.is_monitoring and gen == monitor._sched_gen:
+                    self.probe_pool.submit(self._run_probe, monitor, gen)
+                continue
+            self._schedule_event.wait(wait)
+            self._schedule_event.clear()
+
+    def _run_probe(self, monitor, gen):
+        # Выполняет проверку и планирует следующую только по её завершении,
+        # чтобы две проверки одного устройства не шли одновременно
+        monitor._probe_once()
+        if monitor.is_monitoring and gen == monitor._sched_gen:
+            self.schedule_probe(monitor, PROBE_INTERVAL)
+
     def _reset_all(self):
         # Сбрасывает данные мониторинга и таймер
         for m in self.monitors:
             m.reset()
         self.start_time = None
+        self.start_mono = None
         self.timer_running = False
+        self._timer_text = ''
         self.timer_label.config(text='0:00:00:00')
 
     # ─── Методы работы с устройствами ─────────────────────────────────────────────
     def _add_device(self):
         # Добавление нового устройства
-        ip = simpledialog.askstring(self.lang.get('add','Добавить'), self.lang.get('enter_ip','Введите IP:'), parent=self.root)
+        ip = simpledialog.askstring(self.L.add, self.L.enter_ip, parent=self.root)
         if not ip or ip in self.settings['devices']:
             return
-        name = simpledialog.askstring(self.lang.get('add','Добавить'), self.lang.get('enter_name','Введите имя:'), parent=self.root)
+        name = simpledialog.askstring(self.L.add, self.L.enter_name, parent=self.root)
         if not name:
             return
         # Создание новой плитки
-        if not self.row_frames or len(self.row_frames[-1].winfo_children()) >= TILE_COLUMNS:
-            frame = ttk.Frame(self.root)
-            frame.pack(fill=tk.X)
-            self.row_frames.append(frame)
-        else:
-            frame = self.row_frames[-1]
-        monitor = DeviceMonitor(frame, ip, name, self)
+        if not self.rows or not self.rows[-1].has_space():
+            self.rows.append(TileRow(self.root))
+        monitor = DeviceMonitor(self.rows[-1], ip, name, self)
         self.monitors.append(monitor)
         self.settings['devices'][ip] = name
-        self._save_json(SETTINGS_FILE, self.settings)
+        self._mark_settings_dirty()
         if self.timer_running:
             monitor.start_monitoring()
 
@@ -216,24 +380,28 @@ class NetMonitorApp:
         # Удаление отмеченных устройств
         to_del = [m for m in self.monitors if m.selected.get()]
         if not to_del:
-            messagebox.showinfo(self.lang.get('delete','Удалить'), self.lang.get('no_selection','Не выбрано устройств'), parent=self.root)
+            messagebox.showinfo(self.L.delete, self.L.no_selection, parent=self.root)
             return
         names = ', '.join(m.name for m in to_del)
-        if not messagebox.askyesno(self.lang.get('delete','Удалить'), f"Удалить: {names}?"): return
+        if not messagebox.askyesno(self.L.delete, f"Удалить: {names}?"): return
         for m in to_del:
             m.stop_monitoring()
             self.monitors.remove(m)
             self.settings['devices'].pop(m.ip, None)
-            m.frame.destroy()
-        self._save_json(SETTINGS_FILE, self.settings)
+            # Забываем отложенные обновления плитки: её виджеты уничтожаются
+            with self._pending_ui_lock:
+                self._pending_ui.pop(id(m), None)
+            m.destroy_tile()
+        self._mark_settings_dirty()
 
     # ─── Методы журнала ────────────────────────────────────────────────────────────
     def _show_log_window(self):
         # Отображает окно журнала
-        if hasattr(self, 'log_window') and self.log_window.winfo_exists():
+        if self._log_window_open:
             return
+        self._log_window_open = True
         self.log_window = tk.Toplevel(self.root)
-        self.log_window.title(self.lang.get('log_window_title','Журнал'))
+        self.log_window.title(self.L.log_window_title)
         self.log_text = scrolledtext.ScrolledText(self.log_window, wrap=tk.WORD, width=80, height=20, state='disabled')
         self.log_text.pack(fill=tk.BOTH, expand=True)
         self.log_text.tag_config('error', foreground='red')
@@ -241,22 +409,109 @@ class NetMonitorApp:
 
         frame = ttk.Frame(self.log_window)
         frame.pack(fill=tk.X, pady=5)
-        ttk.Button(frame, text=self.lang.get('clear_log','Очистить журнал'), command=self._clear_log).pack(side=tk.LEFT, padx=5)
-        ttk.Button(frame, text=self.lang.get('save_log','Сохранить журнал'), command=lambda: self._save_log(True)).pack(side=tk.RIGHT, padx=5)
-        self.log_window.protocol('WM_DELETE_WINDOW', self.log_window.destroy)
+        ttk.Button(frame, text=self.L.clear_log, command=self._clear_log).pack(side=tk.LEFT, padx=5)
+        ttk.Button(frame, text=self.L.save_log, command=lambda: self._save_log(True)).pack(side=tk.RIGHT, padx=5)
+        self.log_window.protocol('WM_DELETE_WINDOW', self._close_log_window)
+
+        # Подгрузка более ранних записей при прокрутке к началу
+        for seq in ('<MouseWheel>', '<Button-4>', '<Key-Prior>', '<Key-Up>'):
+            self.log_text.bind(seq, lambda e: self.root.after_idle(self._load_older_log_entries), add='+')
 
-        # Вывод существующих записей
+        # Вывод хвоста журнала одной вставкой; старые записи - по прокрутке
         with self.log_lock:
-            self.log_text.config(state='normal')
-            for txt, tag in self.full_log:
-                self.log_text.insert(tk.END, txt, tag)
-            self.log_text.config(state='disabled')
+            self._log_shown_from = max(0, len(self.full_log) - LOG_WINDOW_TAIL)
+            tail = self.full_log[self._log_shown_from:]
+        self._insert_log_entries(tail, tk.END)
+        self.log_text.see(tk.END)
+
+    def _close_log_window(self):
+        # Сбрасывает флаг и закрывает окно журнала
+        self._log_window_open = False
+        self.log_window.destroy()
+
+    def _insert_log_entries(self, entries, base):
+        # Вставляет блок записей одним вызовом Text.insert + диапазоны тегов
+        if not entries:
+            return
+        joined = ''.join(txt for txt, _, _ in entries)
+        self.log_text.config(state='normal')
+        start = self.log_text.index(f'{base}-1c' if base == tk.END else base)
+        self.log_text.insert(start, joined)
+        offset = 0
+        for txt, tag, span in entries:
+            if tag:
+                s, e = span
+                self.log_text.tag_add(tag, f'{start}+{offset+s}c', f'{start}+{offset+e}c')
+            offset += len(txt)
+        self.log_text.config(state='disabled')
+
+    def _load_older_log_entries(self):
+        # Догружает предыдущую порцию записей, когда журнал прокручен к началу
+        if not self._log_window_open:
+            return
+        if self._log_shown_from <= 0 or self.log_text.yview()[0] > 0.0:
+            return
+        with self.log_lock:
+            new_from = max(0, self._log_shown_from - LOG_WINDOW_TAIL)
+            older = self.full_log[new_from:self._log_shown_from]
+        self._log_shown_from = new_from
+        self._insert_log_entries(older, '1.0')
+
+    def _drain_log_queue(self):
+        # Собирает локальные буферы всех мониторов в журнал (каждые 200 мс).
+        # Блокировка каждого буфера своя, поэтому потоки проверки не мешают
+        # друг другу и почти никогда не ждут дренажа.
+        # Перезапуск тика - в finally, чтобы одна ошибка не остановила цикл
+        try:
+            drained = []
+            for m in self.monitors:
+                with m._local_lock:
+                    if m._local_buffer:
+                        drained.extend(m._local_buffer)
+                        m._local_buffer = []
+            if drained:
+                with self.log_lock:
+                    self.full_log.extend(drained)
+                if self._log_fh is not None:
+                    try:
+                        for txt, _, _ in drained:
+                            self._log_fh.write(txt)
+                        if time.monotonic() - self._log_fh_last_flush >= LOG_FLUSH_INTERVAL:
+                            self._log_fh.flush()
+                            self._log_fh_last_flush = time.monotonic()
+                    except Exception as e:
+                        log_error(f"Ошибка записи файла журнала: {e}")
+                if self._log_window_open:
+                    self._insert_log_entries(drained, tk.END)
+        except Exception as e:
+            log_error(f"Ошибка дренажа журнала: {e}")
+        finally:
+            self.root.after(200, self._drain_log_queue)
+
+    def _flush_pending_ui(self):
+        # Применяет накопленные обновления плиток одним проходом (каждые 250 мс).
+        # Перезапуск тика - в finally, чтобы ошибка одной плитки не остановила цикл
+        try:
+            with self._pending_ui_lock:
+                pending, self._pending_ui = self._pending_ui, {}
+            for monitor, loss_pct, bars in pending.values():
+                # Догнавшая удаление проверка могла оставить запись - пропускаем
+                if not monitor.is_monitoring:
+                    continue
+                monitor.packet_loss_label.config(text=f"Потеря пакетов: {loss_pct:.2f}%")
+                for status in bars:
+                    monitor._update_ui(status)
+        except Exception as e:
+            log_error(f"Ошибка обновления плиток: {e}")
+        finally:
+            self.root.after(250, self._flush_pending_ui)
 
     def _clear_log(self):
         # Очищает журнал в окне и в памяти
         with self.log_lock:
             self.full_log.clear()
-        if hasattr(self, 'log_text'):
+        self._log_shown_from = 0
+        if self._log_window_open:
             self.log_text.config(state='normal')
             self.log_text.delete(1.0, tk.END)
             self.log_text.config(state='disabled')
@@ -266,33 +521,25 @@ class NetMonitorApp:
         try:
             ts = datetime.now().strftime('%Y%m%d_%H%M%S')
             fn = f'log_{ts}.txt'
+            # Под блокировкой - только мелкая копия списка; запись идёт без неё,
+            # буферизованными кусками вместо одной гигантской строки
             with self.log_lock:
-                data = ''.join(txt for txt, _ in self.full_log)
-            with open(fn, 'w', encoding='utf-8') as f:
-                f.write(data)
-            self.last_save_time = datetime.now()
+                entries = list(self.full_log)
+            with open(fn, 'w', encoding='utf-8', buffering=1 << 20) as f:
+                for txt, _, _ in entries:
+                    f.write(txt)
             if notify:
-                messagebox.showinfo(self.lang.get('log_saved','Сохранение'), f'Журнал сохранён в {fn}')
+                messagebox.showinfo(self.L.log_saved, f'Журнал сохранён в {fn}')
             return True
         except Exception as e:
             log_error(f"Ошибка сохранения журнала: {e}")
             return False
 
-    def _schedule_auto_save(self):
-        # Планирует автосохранение каждые AUTO_SAVE_INTERVAL секунд
-        def job():
-            if self.timer_running and self.last_save_time and (datetime.now()-self.last_save_time).total_seconds()>=AUTO_SAVE_INTERVAL:
-                self._save_log()
-            self.auto_save_timer = threading.Timer(AUTO_SAVE_INTERVAL, job)
-            self.auto_save_timer.daemon = True
-            self.auto_save_timer.start()
-        job()
-
     # ─── Методы сводки ─────────────────────────────────────────────────────────────
     def _show_summary(self):
         # Отображает окно сводки по простою устройств
         win = tk.Toplevel(self.root)
-        win.title(self.lang.get('summary_title','Сводка'))
+        win.title(self.L.summary_title)
         ta = scrolledtext.ScrolledText(win, wrap=tk.WORD, width=80, height=20)
         ta.pack(fill=tk.BOTH, expand=True)
         def upd():
@@ -300,7 +547,7 @@ class NetMonitorApp:
             lines = sum((m.get_downtime_summary() for m in self.monitors), [])
             ta.config(state='normal')
             ta.delete(1.0, tk.END)
-            ta.insert(tk.END, '\n'.join(lines) or self.lang.get('no_issues','Нет неполадок'))
+            ta.insert(tk.END, '\n'.join(lines) or self.L.no_issues)
             ta.config(state='disabled')
             win.after(5000, upd)
         upd()
@@ -314,127 +561,276 @@ class NetMonitorApp:
             settings_win.destroy()
             messagebox.showinfo('Info','Перезапустите приложение для применения изменений')
         settings_win = tk.Toplevel(self.root)
-        settings_win.title(self.lang.get('settings','Настройки'))
-        ttk.Label(settings_win, text=self.lang.get('language','Язык')).pack(pady=5)
+        settings_win.title(self.L.settings)
+        ttk.Label(settings_win, text=self.L.language).pack(pady=5)
         var = original_StringVar(value=self.settings.get('language','ru'))
         ttk.Radiobutton(settings_win, text='English', variable=var, value='en').pack()
         ttk.Radiobutton(settings_win, text='Русский', variable=var, value='ru').pack()
-        ttk.Button(settings_win, text=self.lang.get('save','Сохранить'), command=save_and_close).pack(pady=10)
+        ttk.Button(settings_win, text=self.L.save, command=save_and_close).pack(pady=10)
         settings_win.transient(self.root)
         settings_win.grab_set()
         self.root.wait_window(settings_win)
 
+# ─── Строка плиток на общем Canvas ───────────────────────────────────────────────
+class TileRow:
+    # Все плитки строки рисуются на одном Canvas со смещением по X:
+    # виджетов-canvas становится в TILE_COLUMNS раз меньше, а обновления
+    # соседних плиток коалесцируются одной перерисовкой
+    def __init__(self, parent):
+        self.canvas = tk.Canvas(parent, width=TILE_COLUMNS * TILE_PITCH, height=TILE_HEIGHT + 10)
+        self.canvas.pack(fill=tk.X, anchor='w')
+        self.canvas.bind('<Double-1>', self._on_double_click)
+        self.monitors = []
+
+    def has_space(self):
+        return len(self.monitors) < TILE_COLUMNS
+
+    def add(self, monitor):
+        # Выделяет монитору следующий свободный столбец
+        column = len(self.monitors)
+        self.monitors.append(monitor)
+        return column
+
+    def remove(self, monitor):
+        # Убирает плитку из строки и сдвигает оставшиеся влево
+        idx = self.monitors.index(monitor)
+        self.monitors.pop(idx)
+        for m in self.monitors[idx:]:
+            m._shift_tile(-TILE_PITCH)
+
+    def _on_double_click(self, event):
+        # Находит плитку по координате клика и открывает переименование
+        column = int(event.x // TILE_PITCH)
+        if 0 <= column < len(self.monitors):
+            self.monitors[column]._rename_device(event)
+
 # ─── Класс мониторинга одного устройства ─────────────────────────────────────────
 class DeviceMonitor:
-    def __init__(self, parent, ip, name, app_ref):
+    def __init__(self, row, ip, name, app_ref):
         # Сохраняем ссылку на приложение и параметры
         self.app = app_ref
         self.ip = ip
         self.name = name
-        self.availability = []      # История статуса (1 или 0)
+        self.availability = collections.deque(maxlen=720)  # История статуса (1 или 0)
+        self._up_count = 0          # Количество единиц в availability
         self.is_down = False        # Флаг простоя
+        self.is_monitoring = False  # Устройство поставлено на мониторинг
+        self._sched_gen = 0         # Поколение записей в куче планировщика
         self.current_downtime_start = None
-
-        # Создание фрейма плитки
-        self.frame = ttk.Frame(parent, relief=tk.RIDGE, padding=5)
-        self.frame.config(width=200, height=150)
-        self.frame.pack_propagate(False)
-        self.frame.pack(side=tk.LEFT, padx=5, pady=5)
+        self.downtime_summary = []  # Завершённые периоды простоя (начало, конец)
+
+        # Локальный буфер журнала: пишет только этот монитор, забирает дренаж
+        self._local_buffer = []
+        self._local_lock = threading.Lock()
+        self._overflow = []         # Записи, отложенные при занятой блокировке
+
+        # Один ICMP-сокет на устройство (None -> запасной вариант через ping)
+        self._icmp_sock = _make_icmp_socket()
+        self._icmp_ident = os.getpid() & 0xFFFF
+        self._icmp_seq = 0
+
+        # Размещение плитки на общем canvas строки: все элементы помечены
+        # тегом плитки, чтобы их можно было сдвигать и удалять одним вызовом
+        self.row = row
+        self.canvas = row.canvas
+        self.column = row.add(self)
+        self.x_offset = self.column * TILE_PITCH + 5
+        self.tag = f'tile_{id(self)}'
+        x = self.x_offset
+        self.canvas.create_rectangle(x, 5, x + TILE_WIDTH, 5 + TILE_HEIGHT, outline='grey', tags=self.tag)
 
         # Чекбокс для выбора
-        self.selected = tk.BooleanVar(master=self.frame)
-        ttk.Checkbutton(self.frame, variable=self.selected).place(relx=1, rely=0, anchor='ne', x=-4, y=4)
+        self.selected = tk.BooleanVar(master=self.canvas)
+        self._check = ttk.Checkbutton(self.canvas, variable=self.selected)
+        self.canvas.create_window(x + TILE_WIDTH - 4, 9, window=self._check, anchor='ne', tags=self.tag)
 
         # Метка имени и IP
-        self.label = ttk.Label(self.frame, text=f"{self.name}: {self.ip}")
-        self.label.pack(anchor='w')
+        self.label = ttk.Label(self.canvas, text=f"{self.name}: {self.ip}")
+        self.canvas.create_window(x + 5, 9, window=self.label, anchor='nw', tags=self.tag)
 
-        # Canvas для графического отображения доступности
-        self.canvas = tk.Canvas(self.frame, width=190, height=80, bg='white')
-        self.canvas.pack(pady=4)
+        # Область графика доступности (рисуется прямо на общем canvas)
+        self.canvas.create_rectangle(x + 5, GRAPH_TOP, x + 5 + GRAPH_SLOTS * 3 + 2, GRAPH_BASE, fill='white', outline='grey', tags=self.tag)
+        self._bar_ids = []          # Кольцо из id прямоугольников графика
+        self._bar_slot = 0          # Слот для следующего отсчёта
 
         # Метка потерь пакетов
-        self.packet_loss_label = ttk.Label(self.frame, text=f"Потеря пакетов: 0%")
-        self.packet_loss_label.pack(anchor='w')
-
-        # Двойной клик для переименования
-        self.canvas.bind('<Double-1>', self._rename_device)
+        self.packet_loss_label = ttk.Label(self.canvas, text=f"Потеря пакетов: 0%")
+        self.canvas.create_window(x + 5, GRAPH_BASE + 5, window=self.packet_loss_label, anchor='nw', tags=self.tag)
 
     def start_monitoring(self):
-        # Запуск фонового потока мониторинга
+        # Регистрация устройства в общем планировщике
+        if self.is_monitoring:
+            return
         self.is_monitoring = True
-        threading.Thread(target=self._monitor, daemon=True).start()
+        self._sched_gen += 1   # Записи прошлого запуска становятся недействительными
+        self.app.schedule_probe(self)
 
     def stop_monitoring(self):
-        # Остановка мониторинга
+        # Остановка мониторинга; смена поколения гасит очереди в куче
         self.is_monitoring = False
+        self._sched_gen += 1
 
     def reset(self):
         # Сброс данных графика
         self.availability.clear()
+        self._up_count = 0
         self.packet_loss_label.config(text="Потеря пакетов: 0%")
-        self._update_ui()
-
-    def _monitor(self):
-        # Основной цикл проверки доступности
-        while self.is_monitoring:
-            try:
-                res = subprocess.run(["ping", "-n", "1", self.ip], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-                out = res.stdout.decode('cp866', errors='ignore')
-                lost = "100% loss" in out or "100% потерь" in out
-                ts = datetime.now()
-                status = 0 if lost else 1
-
-                # Обработка начала/окончания простоя
-                if lost and not self.is_down:
-                    self.is_down = True
-                    self.current_downtime_start = ts
-                elif not lost and self.is_down:
-                    self.is_down = False
-                    self.app.monitors[self.app.monitors.index(self)].downtime_summary.append((self.current_downtime_start, ts))
-                    self.current_downtime_start = None
-
-                # Запись в общий журнал
-                entry = [(f"[{ts.strftime('%H:%M:%S')}] ", None),
-                         (f"Обмен с {self.name}[{self.ip}]\n", None),
-                         ("Ответ не получен\n" if lost else "Ответ получен\n", 'error' if lost else None)]
-                with self.app.log_lock:
-                    self.app.full_log.extend(entry)
-                if hasattr(self.app, 'log_text') and self.app.log_text.winfo_exists():
-                    self.app.root.after(0, self.app.log_text.insert, tk.END, ''.join(txt for txt, _ in entry))
-
-                # Обновление данных и UI
-                self.availability.append(status)
-                if len(self.availability) > 720:
-                    self.availability.pop(0)
-                loss_pct = (1 - sum(self.availability)/len(self.availability)) * 100
-                self.app.root.after(0, lambda: self.packet_loss_label.config(text=f"Потеря пакетов: {loss_pct:.2f}%"))
-                self.app.root.after(0, self._update_ui)
-                time.sleep(5)
-            except Exception as e:
-                log_error(f"Ошибка мониторинга {self.ip}: {e}")
+        for item in self._bar_ids:
+            self.canvas.delete(item)
+        self._bar_ids.clear()
+        self._bar_slot = 0
+
+    def _probe(self):
+        # Одна проверка доступности. Возвращает True, если ответ НЕ получен.
+        if self._icmp_sock is not None:
+            return self._probe_icmp()
+        return self._probe_subprocess()
+
+    def _probe_icmp(self):
+        # Отправка ICMP echo-запроса через собственный сокет (без процесса ping)
+        self._icmp_seq = (self._icmp_seq + 1) & 0xFFFF
+        header = struct.pack('!BBHHH', 8, 0, 0, self._icmp_ident, self._icmp_seq)
+        packet = struct.pack('!BBHHH', 8, 0, _icmp_checksum(header), self._icmp_ident, self._icmp_seq)
+        try:
+            # Сброс пакетов, оставшихся от прошлых проверок (например, ответа,
+            # пришедшего сразу после таймаута), чтобы не принять их за свежий
+            while select.select([self._icmp_sock], [], [], 0)[0]:
+                self._icmp_sock.recvfrom(1024)
+            self._icmp_sock.sendto(packet, (self.ip, 0))
+            deadline = time.monotonic() + PROBE_TIMEOUT
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return True
+                ready, _, _ = select.select([self._icmp_sock], [], [], remaining)
+                if not ready:
+                    return True
+                data, addr = self._icmp_sock.recvfrom(1024)
+                if addr[0] == self.ip and self._match_reply(data):
+                    return False
+        except OSError:
+            return True
 
-    def _update_ui(self):
-        # Отрисовка графика доступности
-        self.canvas.delete('all')
-        for i, v in enumerate(self.availability):
-            x, y = i*3, 80 - v*70
-            color = 'green' if v else 'red'
-            self.canvas.create_rectangle(x, y, x+2, 80, fill=color, outline=color)
+    def _match_reply(self, data):
+        # Проверяет, что пакет - echo-ответ именно на наш последний запрос.
+        # Raw-сокет отдаёт пакет вместе с IP-заголовком (и весь ICMP-трафик
+        # хоста), dgram - только ICMP-часть своих ответов
+        is_raw = self._icmp_sock.type == socket.SOCK_RAW
+        if is_raw:
+            if len(data) < 20:
+                return False
+            data = data[(data[0] & 0x0F) * 4:]
+        if len(data) < 8:
+            return False
+        icmp_type, _, _, ident, seq = struct.unpack('!BBHHH', data[:8])
+        if icmp_type != 0 or seq != self._icmp_seq:
+            return False
+        # На dgram-сокете ident подменяется ядром, сверять его можно только на raw
+        return ident == self._icmp_ident or not is_raw
+
+    def _probe_subprocess(self):
+        # Запасной вариант: внешний ping (если ICMP-сокет недоступен).
+        # Вывод не захватывается - результат берётся из кода возврата,
+        # что убирает декодирование cp866 и поиск подстрок на каждом тике
+        if os.name == 'nt':
+            cmd = ["ping", "-n", "1", "-w", "1000", self.ip]
+            flags = 0x08000000  # CREATE_NO_WINDOW - без мигания консоли
+        else:
+            cmd = ["ping", "-c", "1", "-W", "1", self.ip]
+            flags = 0
+        res = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, creationflags=flags)
+        return res.returncode != 0
+
+    def _probe_once(self):
+        # Одна итерация проверки доступности (выполняется в пуле потоков)
+        if not self.is_monitoring:
+            return
+        try:
+            lost = self._probe()
+            status = 0 if lost else 1
+
+            # Обработка начала/окончания простоя (datetime нужен только здесь)
+            if lost and not self.is_down:
+                self.is_down = True
+                self.current_downtime_start = datetime.now()
+            elif not lost and self.is_down:
+                self.is_down = False
+                self.downtime_summary.append((self.current_downtime_start, datetime.now()))
+                self.current_downtime_start = None
+
+            # Запись в общий журнал: одна строка + диапазон подсветки ошибки
+            verdict = "Ответ не получен\n" if lost else "Ответ получен\n"
+            line = f"[{now_hms()}] Обмен с {self.name}[{self.ip}]\n{verdict}"
+            if lost:
+                entry = (line, 'error', (len(line) - len(verdict), len(line)))
+            else:
+                entry = (line, None, None)
+            # Журнал не должен задерживать проверку: если блокировка занята
+            # дренажем, запись откладывается в личный буфер до следующего тика
+            if self._local_lock.acquire(timeout=0.05):
+                try:
+                    if self._overflow:
+                        self._local_buffer.extend(self._overflow)
+                        self._overflow.clear()
+                    self._local_buffer.append(entry)
+                finally:
+                    self._local_lock.release()
+            else:
+                self._overflow.append(entry)
+
+            # Обновление данных и UI (O(1): кольцевой буфер + счётчик единиц)
+            evicted = self.availability[0] if len(self.availability) == 720 else 0
+            self.availability.append(status)
+            self._up_count += status - evicted
+            loss_pct = (1 - self._up_count/len(self.availability)) * 100
+            with self.app._pending_ui_lock:
+                pend = self.app._pending_ui.get(id(self))
+                bars = pend[2] if pend else []
+                bars.append(status)
+                self.app._pending_ui[id(self)] = (self, loss_pct, bars)
+        except Exception as e:
+            log_error(f"Ошибка мониторинга {self.ip}: {e}")
+
+    def _update_ui(self, status):
+        # Инкрементальная отрисовка одного отсчёта: прямоугольники переиспользуются
+        # по кольцу, укладывающемуся в ширину плитки, без полной перерисовки
+        x = self.x_offset + 5 + self._bar_slot * 3
+        y = GRAPH_BASE - status * 70
+        color = 'green' if status else 'red'
+        if self._bar_slot < len(self._bar_ids):
+            item = self._bar_ids[self._bar_slot]
+            self.canvas.coords(item, x, y, x + 2, GRAPH_BASE)
+            self.canvas.itemconfig(item, fill=color, outline=color)
+        else:
+            self._bar_ids.append(self.canvas.create_rectangle(x, y, x + 2, GRAPH_BASE, fill=color, outline=color, tags=self.tag))
+        self._bar_slot = (self._bar_slot + 1) % GRAPH_SLOTS
+
+    def _shift_tile(self, dx):
+        # Сдвигает все элементы плитки по X (после удаления соседа слева)
+        self.canvas.move(self.tag, dx, 0)
+        self.x_offset += dx
+        self.column += dx // TILE_PITCH
+
+    def destroy_tile(self):
+        # Удаляет элементы плитки с общего canvas и освобождает столбец
+        self.canvas.delete(self.tag)
+        for w in (self._check, self.label, self.packet_loss_label):
+            w.destroy()
+        self.row.remove(self)
 
     def _rename_device(self, _):
         # Переименование устройства через диалог
-        new_name = simpledialog.askstring(self.app.lang.get('rename','Переименование'), self.app.lang.get('rename_prompt','Введите новое имя:'), parent=self.frame)
+        new_name = simpledialog.askstring(self.app.L.rename, self.app.L.rename_prompt, parent=self.canvas)
         if new_name:
             self.name = new_name
             self.label.config(text=f"{self.name}: {self.ip}")
             self.app.settings['devices'][self.ip] = new_name
-            self.app._save_json(SETTINGS_FILE, self.app.settings)
+            self.app._mark_settings_dirty()
 
     def get_downtime_summary(self):
         # Возвращает список строк с периодами простоя
         lines = []
-        for start, end in getattr(self, 'downtime_summary', []):
+        for start, end in self.downtime_summary:
             lines.append(f"С {start.strftime('%H:%M:%S')} по {end.strftime('%H:%M:%S')} {start.strftime('%d.%m')}: {self.name}")
         if self.is_down and self.current_downtime_start:
             d = self.current_downtime_start